@@ -1,22 +1,113 @@
 import pandas as pd
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from datetime import datetime, time, timedelta
-from openpyxl import load_workbook
+from datetime import datetime
+from openpyxl import Workbook, load_workbook
 from openpyxl.comments import Comment
 from openpyxl.utils import column_index_from_string, get_column_letter
 from openpyxl.styles import Alignment
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format
+from openpyxl.utils.datetime import MAC_EPOCH, WINDOWS_EPOCH, from_excel
 import sys
 import os
 import json
+import hashlib
+import shutil
 import numpy as np
 import threading
+import argparse
+import base64
+import multiprocessing
+import signal
+import tempfile
+import time
+import uuid
+import zipfile
+import posixpath
+from collections import namedtuple
+from functools import lru_cache
+import xml.etree.ElementTree as ET
+from xml.parsers import expat
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 # 配置文件相关路径
 script_path = os.path.abspath(sys.argv[0])
 script_dir = os.path.dirname(script_path)
 script_name = os.path.splitext(os.path.basename(script_path))[0]
 CONFIG_FILE = os.path.join(script_dir, f"{script_name}_config.json")
+CACHE_DIR = os.path.join(script_dir, f"{script_name}_cache")
+CACHE_MAX_BYTES = 512 * 1024 * 1024  # 解析缓存容量上限
+SNAPSHOT_VERSION = 3  # 快照格式或解析规则变化时递增，使旧缓存失效
+SCHEDULE_CACHE_DIR = os.path.join(CACHE_DIR, "schedules")
+SCHEDULE_VERSION = 1  # 作息表结构变化时递增，使旧缓存失效
+REST_DAYS = (6,)  # 休息日（Python weekday，6=周日）
+_compiled_schedules = {}  # 本进程已载入的作息表（按配置指纹）
+
+# 服务模式默认参数
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+SERVICE_WORKERS = 2
+SERVICE_MAX_PENDING = 32  # 排队+处理中的任务上限
+SERVICE_KEEP_JOBS = 100  # 保留结果的已完成任务数
+SERVICE_TEXT_FIELDS = (  # 按文本读取的配置字段
+    "sheet_name",
+    "start_col",
+    "end_col",
+    "write_col",
+    "start_row",
+    "key_cols",
+    "split_dates",
+)
+XLSX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# 结果输出工作表名称
+SUMMARY_SHEET_NAME = "工时汇总"
+SPLIT_SHEET_NAME = "分段工时"
+EXCEPTION_SHEET_NAME = "异常记录"
+OVERLAP_SHEET_NAME = "重叠记录"
+RESULT_SHEET_NAME = "工时结果"
+OUTPUT_MODES = ("写回原文件", "独立结果文件")
+RESULT_PAGE_SIZE = 200
+RESULT_FILTERS = ("全部记录", "无效记录", "零值记录", "含周日记录")
+RESULT_ALL_PAIRS = "全部列对"
+
+# 逐行状态码对应的名称（下标即状态码）
+STATUS_NAMES = ("正常", "空值记录", "格式错误", "时间倒置", "零值记录")
+EXCEPTION_OUTPUT_OPTIONS = ("不输出", "工作表", "CSV文件")
+
+# xlsx 流式读取相关常量
+XLSX_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+XLSX_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+XLSX_DOC_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+CJK_DATE_FORMAT_IDS = set(range(27, 37)) | set(range(50, 59))  # 中日韩区域内置日期格式
+EXCEL_NA_STRINGS = (
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+)  # 与 pandas 默认缺失值文本一致
+
+# 时间列的列式结构组成部分（见 parse_time_column）
+TIME_COLUMN_PARTS = ("times", "nulls", "texts")
+
+SECONDS_PER_DAY = 24 * 3600
+NS_PER_DAY = SECONDS_PER_DAY * 10**9
 
 
 def generate_time_options():
@@ -63,12 +154,165 @@ def format_time(time_value, time_format):
         return time_value
 
 
+def parse_column_pairs_text(text):
+    """解析“C-D:E; F-G”形式的列对文本为 [[开始, 结束, 写入], ...]"""
+    pairs = []
+    for item in text.replace("；", ";").split(";"):
+        if not item.strip():
+            continue
+        cols, _, write_col = item.partition(":")
+        start_col, _, end_col = cols.partition("-")
+        pairs.append([c.strip().upper() for c in (start_col, end_col, write_col)])
+    return pairs
+
+
+def format_column_pairs_text(pairs):
+    """将列对列表格式化为“C-D:E; F-G”形式的文本"""
+    items = []
+    for start_col, end_col, *rest in pairs:
+        write_col = rest[0] if rest else ""
+        items.append(f"{start_col}-{end_col}" + (f":{write_col}" if write_col else ""))
+    return "; ".join(items)
+
+
+def build_final_config(config):
+    """校验界面/配置文件格式的配置，并转换为 main_process 所需的格式
+
+    校验失败时抛出 ValueError（消息为逐行列出的全部错误）。
+    """
+    errors = []
+
+    file_path = config.get("file_path", "")
+    if not file_path:
+        errors.append("请选择Excel文件")
+    elif not os.path.exists(file_path):
+        errors.append("文件路径不存在")
+
+    start_col = config.get("start_col", "").strip().upper()
+    end_col = config.get("end_col", "").strip().upper()
+    for col in [start_col, end_col]:
+        if not col.isalpha():
+            errors.append("列标识必须为字母")
+
+    try:
+        start_row = int(config.get("start_row", ""))
+        if start_row < 1:
+            errors.append("起始行号必须≥1")
+    except (TypeError, ValueError):
+        errors.append("起始行号格式错误")
+
+    write_col = config.get("write_col", "").strip().upper()
+    if write_col:
+        if not write_col.isalpha():
+            errors.append("写值列标识必须为字母")
+
+    # 列对：第一对来自 start_col/end_col/write_col，其余来自 extra_pairs
+    pairs = [(start_col, end_col, write_col)]
+    for pair in config.get("extra_pairs", []):
+        pair = [str(c).strip().upper() for c in list(pair) + ["", ""]][:3]
+        if not (pair[0].isalpha() and pair[1].isalpha()):
+            errors.append(f"列对开始/结束列标识必须为字母: {'-'.join(pair[:2])}")
+        elif pair[2] and not pair[2].isalpha():
+            errors.append(f"列对写值列标识必须为字母: {pair[2]}")
+        pairs.append(tuple(pair))
+
+    # 独立结果文件模式不写回源文件，写值列的冲突规则不适用
+    separate_output = config.get("output_mode") == "独立结果文件"
+    write_cols = []
+    if not errors:
+        write_cols = [
+            w or number_to_excel_column(excel_column_to_number(e) + 1)
+            for _, e, w in pairs
+        ]
+    if write_cols and not separate_output:
+        time_cols = {c for s, e, _ in pairs for c in (s, e)}
+        for col in write_cols:
+            if col in time_cols:
+                errors.append(f"写值列 {col} 不能与开始/结束列相同")
+        if len(set(write_cols)) < len(write_cols):
+            errors.append("各列对的写值列不能重复")
+
+    key_cols = [
+        c.strip() for c in config.get("key_cols", "").upper().split(",") if c.strip()
+    ]
+    for col in key_cols:
+        if not col.isalpha():
+            errors.append("分组键列标识必须为字母")
+        elif not separate_output and (col == write_col or col in write_cols):
+            errors.append("分组键列不能与写值列相同")
+    if config.get("check_overlap") and not key_cols:
+        errors.append("重叠检查需要设置分组键列")
+    if config.get("output_mode", OUTPUT_MODES[0]) not in OUTPUT_MODES:
+        errors.append(f"结果输出方式无效，可选：{'、'.join(OUTPUT_MODES)}")
+
+    split_boundaries = []
+    for text in config.get("split_dates", "").replace("，", ",").split(","):
+        if text.strip():
+            try:
+                split_boundaries.append(pd.Timestamp(text.strip()))
+            except ValueError:
+                errors.append(f"结算分割日期格式错误: {text.strip()}")
+    split_boundaries = sorted(set(split_boundaries))
+
+    work_periods = []
+    for p in config.get("work_periods", []):
+        try:
+            period = (
+                datetime.strptime(p[0], "%H:%M").time(),
+                datetime.strptime(p[1], "%H:%M").time(),
+            )
+        except (TypeError, ValueError, IndexError):
+            errors.append(f"时间段格式错误: {p}")
+            continue
+        if period[0] >= period[1]:
+            errors.append(f"时间段开始时间不能晚于结束时间: {p[0]}-{p[1]}")
+        work_periods.append(period)
+    ordered = sorted(work_periods)
+    for prev, curr in zip(ordered, ordered[1:]):
+        if curr[0] < prev[1]:
+            errors.append("工作时间段存在重叠")
+            break
+
+    if errors:
+        raise ValueError("\n".join(errors))
+
+    return {
+        "file_path": file_path,
+        "sheet_name": config.get("sheet_name") or None,
+        "start_col": excel_column_to_number(start_col),
+        "end_col": excel_column_to_number(end_col),
+        "write_col": excel_column_to_number(write_col) if write_col else None,
+        "column_pairs": [
+            (
+                excel_column_to_number(s),
+                excel_column_to_number(e),
+                excel_column_to_number(w),
+            )
+            for (s, e, _), w in zip(pairs, write_cols)
+        ],
+        "skiprows": start_row - 1,
+        "auto_save": config.get("auto_save", False),
+        "time_format": config.get("time_format", "小时时间格式"),
+        "day_calc": config.get("day_calc", False),
+        "work_periods": work_periods,
+        "open_dir": config.get("open_dir", True),
+        "key_cols": [excel_column_to_number(c) for c in key_cols],
+        "summary_sheet": config.get("summary_sheet", False),
+        "check_overlap": config.get("check_overlap", False),
+        "exceptions_output": config.get("exceptions_output", "不输出"),
+        "output_mode": config.get("output_mode", OUTPUT_MODES[0]),
+        "use_cache": config.get("use_cache", True),
+        "split_boundaries": split_boundaries,
+    }
+
+
 class ConfigWindow:
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("工时计算配置 v5.0")
         self.root.minsize(480, 600)
         self.final_config = None
+        self.results = None
         self.processing_done = False
         self.original_file_path = ""
         self.original_sheet_name = ""
@@ -110,7 +354,8 @@ class ConfigWindow:
     def _create_widgets(self):
         """创建主界面组件"""
         main_frame = ttk.Frame(self.root, padding=15)
-        main_frame.pack(expand=True, fill=tk.BOTH)
+        main_frame.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+        self.main_frame = main_frame
 
         self._create_file_section(main_frame)
         self._create_sheet_section(main_frame)
@@ -121,6 +366,9 @@ class ConfigWindow:
         self._create_status_bar(main_frame)
         self._create_action_buttons(main_frame)
 
+        # 结果面板在首次处理完成后显示于配置区右侧
+        self.result_pane = ResultPane(self.root)
+
     def _create_file_section(self, parent):
         """文件选择区域"""
         frame = ttk.LabelFrame(parent, text=" 文件配置 ", padding=10)
@@ -150,6 +398,7 @@ class ConfigWindow:
             ("* 结束时间列标:", "end_col", "请输入字母，如B或AB"),
             ("  写入时长列标:", "write_col", "如留空则为结束时间列右侧"),
             ("* 计算起始行号:", "start_row", "执行计算的起始行"),
+            ("  分组键列标:", "key_cols", "可选，多列用逗号分隔，如C,D"),
         ]
 
         self.entries = {}
@@ -172,6 +421,15 @@ class ConfigWindow:
                 side=tk.LEFT, padx=5
             )
 
+        row_frame = ttk.Frame(frame)
+        row_frame.pack(fill=tk.X, pady=2)
+        ttk.Label(row_frame, text="  其他列对:", width=12).pack(side=tk.LEFT)
+        self.extra_pairs_entry = ttk.Entry(row_frame, width=24)
+        self.extra_pairs_entry.pack(side=tk.LEFT, padx=2)
+        ttk.Label(
+            row_frame, text="可选，开始-结束:写入，如C-D:E; F-G", foreground="#666"
+        ).pack(side=tk.LEFT, padx=5)
+
         self.entries["start_col"].insert(0, "A")
         self.entries["end_col"].insert(0, "B")
         self.entries["start_row"].insert(0, "2")
@@ -251,6 +509,63 @@ class ConfigWindow:
         )
         self.topmost_check.pack(side=tk.LEFT, padx=10)
 
+        # 结果输出选项
+        output_frame = ttk.Frame(parent)
+        output_frame.pack(fill=tk.X, pady=5)
+
+        self.summary_var = tk.BooleanVar()
+        self.summary_check = ttk.Checkbutton(
+            output_frame,
+            text="输出工时汇总表（按分组键/月份）",
+            variable=self.summary_var,
+        )
+        self.summary_check.pack(side=tk.LEFT)
+
+        self.check_overlap_var = tk.BooleanVar()
+        self.check_overlap_check = ttk.Checkbutton(
+            output_frame, text="检查同键时间重叠", variable=self.check_overlap_var
+        )
+        self.check_overlap_check.pack(side=tk.LEFT, padx=10)
+
+        ttk.Label(output_frame, text="异常记录输出:").pack(side=tk.LEFT, padx=(10, 2))
+        self.exceptions_output_var = tk.StringVar(value="不输出")
+        self.exceptions_output_combobox = ttk.Combobox(
+            output_frame,
+            textvariable=self.exceptions_output_var,
+            values=EXCEPTION_OUTPUT_OPTIONS,
+            state="readonly",
+            width=8,
+        )
+        self.exceptions_output_combobox.pack(side=tk.LEFT)
+
+        self.use_cache_var = tk.BooleanVar(value=True)
+        self.use_cache_check = ttk.Checkbutton(
+            output_frame, text="启用解析缓存", variable=self.use_cache_var
+        )
+        self.use_cache_check.pack(side=tk.LEFT, padx=10)
+
+        # 结算区间拆分设置
+        split_frame = ttk.Frame(parent)
+        split_frame.pack(fill=tk.X, pady=2)
+
+        ttk.Label(split_frame, text="结算分割日期:").pack(side=tk.LEFT)
+        self.split_dates_entry = ttk.Entry(split_frame, width=30)
+        self.split_dates_entry.pack(side=tk.LEFT, padx=5)
+        ttk.Label(
+            split_frame, text="可选，如2024-01-26,2024-02-26", foreground="#666"
+        ).pack(side=tk.LEFT)
+
+        self.output_mode_var = tk.StringVar(value=OUTPUT_MODES[0])
+        self.output_mode_combobox = ttk.Combobox(
+            split_frame,
+            textvariable=self.output_mode_var,
+            values=OUTPUT_MODES,
+            state="readonly",
+            width=12,
+        )
+        self.output_mode_combobox.pack(side=tk.RIGHT)
+        ttk.Label(split_frame, text="结果输出:").pack(side=tk.RIGHT, padx=(10, 2))
+
     def _create_status_bar(self, parent):
         """状态栏"""
         self.status_label = ttk.Label(parent, text="就绪", foreground="#666")
@@ -393,7 +708,14 @@ class ConfigWindow:
             self.save_btn,
             self.ok_btn,
             *self.entries.values(),
+            self.extra_pairs_entry,
             self.auto_save_check,
+            self.summary_check,
+            self.check_overlap_check,
+            self.exceptions_output_combobox,
+            self.output_mode_combobox,
+            self.use_cache_check,
+            self.split_dates_entry,
             self.time_format_combobox,
         ]
         for widget in widgets:
@@ -435,11 +757,24 @@ class ConfigWindow:
                 for key in self.entries:
                     self.entries[key].delete(0, tk.END)
                     self.entries[key].insert(0, config.get(key, ""))
+                self.extra_pairs_entry.delete(0, tk.END)
+                self.extra_pairs_entry.insert(
+                    0, format_column_pairs_text(config.get("extra_pairs", []))
+                )
                 self.auto_save_var.set(config.get("auto_save", False))
                 self.time_format_var.set(config.get("time_format", "小时时间格式"))
                 self.day_calc_var.set(config.get("day_calc", False))
                 self.open_dir_var.set(config.get("open_dir", True))  # 加载打开目录设置
                 self.topmost_var.set(config.get("topmost", True))  # 加载置顶设置
+                self.summary_var.set(config.get("summary_sheet", False))
+                self.check_overlap_var.set(config.get("check_overlap", False))
+                self.exceptions_output_var.set(
+                    config.get("exceptions_output", "不输出")
+                )
+                self.use_cache_var.set(config.get("use_cache", True))
+                self.output_mode_var.set(config.get("output_mode", OUTPUT_MODES[0]))
+                self.split_dates_entry.delete(0, tk.END)
+                self.split_dates_entry.insert(0, config.get("split_dates", ""))
 
                 # 强制设置表名（新增修复点）
                 if self.original_sheet_name:
@@ -459,7 +794,9 @@ class ConfigWindow:
             "start_col": self.entries["start_col"].get().strip().upper(),
             "end_col": self.entries["end_col"].get().strip().upper(),
             "write_col": self.entries["write_col"].get().strip().upper(),
+            "extra_pairs": parse_column_pairs_text(self.extra_pairs_entry.get()),
             "start_row": self.entries["start_row"].get().strip(),
+            "key_cols": self.entries["key_cols"].get().strip().upper(),
             "auto_save": self.auto_save_var.get(),
             "time_format": self.time_format_var.get(),
             "day_calc": self.day_calc_var.get(),
@@ -470,6 +807,12 @@ class ConfigWindow:
             ],
             "open_dir": self.open_dir_var.get(),  # 新增：保存打开目录的设置
             "topmost": self.topmost_var.get(),  # 新增：保存置顶设置
+            "summary_sheet": self.summary_var.get(),
+            "check_overlap": self.check_overlap_var.get(),
+            "exceptions_output": self.exceptions_output_var.get(),
+            "output_mode": self.output_mode_var.get(),
+            "use_cache": self.use_cache_var.get(),
+            "split_dates": self.split_dates_entry.get().strip(),
         }
 
     def save_config_to_file(self, config, silent=False):
@@ -490,30 +833,10 @@ class ConfigWindow:
         try:
             config = self.get_current_config()
             errors = []
-
-            if not config["file_path"]:
-                errors.append("请选择Excel文件")
-            elif not os.path.exists(config["file_path"]):
-                errors.append("文件路径不存在")
-
-            for col in [config["start_col"], config["end_col"]]:
-
-                if not col.isalpha():
-                    errors.append("列标识必须为字母")
-
             try:
-                start_row = int(config["start_row"])
-                if start_row < 1:
-                    errors.append("起始行号必须≥1")
-            except:
-                errors.append("起始行号格式错误")
-
-            write_col = config["write_col"]
-            if write_col:
-                if not write_col.isalpha():
-                    errors.append("写值列标识必须为字母")
-                elif write_col == config["start_col"] or write_col == config["end_col"]:
-                    errors.append("写值列不能与开始/结束列相同")
+                self.final_config = build_final_config(config)
+            except ValueError as e:
+                errors.append(str(e))
 
             if not self.validate_time_slots():
                 errors.append("请修正时间段设置错误")
@@ -521,26 +844,6 @@ class ConfigWindow:
             if errors:
                 raise ValueError("\n".join(errors))
 
-            self.final_config = {
-                "file_path": config["file_path"],
-                "sheet_name": config["sheet_name"] or None,
-                "start_col": excel_column_to_number(config["start_col"]),
-                "end_col": excel_column_to_number(config["end_col"]),
-                "write_col": excel_column_to_number(write_col) if write_col else None,
-                "skiprows": int(config["start_row"]) - 1,
-                "auto_save": self.auto_save_var.get(),
-                "time_format": config["time_format"],
-                "day_calc": config["day_calc"],
-                "work_periods": [
-                    (
-                        datetime.strptime(p[0], "%H:%M").time(),
-                        datetime.strptime(p[1], "%H:%M").time(),
-                    )
-                    for p in config["work_periods"]
-                ],
-                "open_dir": config["open_dir"],  # 新增：传递打开目录设置
-            }
-
             self.toggle_controls(tk.DISABLED)
             self.processing_done = False
             self.status_label.configure(text="处理中...")
@@ -563,8 +866,10 @@ class ConfigWindow:
     def run_processing(self):
         """运行处理"""
         try:
-            success, result_data = main_process(self.final_config)
+            results = {}
+            success, result_data = main_process(self.final_config, results=results)
             if success:
+                self.results = results
                 self.root.after(0, lambda: self.show_result(result_data))
                 if self.final_config["auto_save"]:
                     current_config = self.get_current_config()
@@ -583,13 +888,23 @@ class ConfigWindow:
     def show_result(self, result_data):
         """显示处理结果"""
         self.status_label.configure(text="处理完成")
-        messagebox.showinfo("处理完成", "\n".join(result_data))
+        self.show_result_pane()
+        self.result_pane.load(self.results, result_data)
         self.toggle_controls(tk.NORMAL)
 
         # 根据复选框状态决定是否打开文件目录
         if self.final_config["open_dir"]:
             self.open_result_directory()
 
+    def show_result_pane(self):
+        """首次出结果时在配置区右侧展开结果面板，由结果面板占用多余宽度"""
+        if self.result_pane.frame.winfo_manager():
+            return
+        self.main_frame.pack_configure(expand=False, fill=tk.Y)
+        self.result_pane.frame.pack(
+            side=tk.LEFT, expand=True, fill=tk.BOTH, padx=(0, 15), pady=15
+        )
+
     def open_result_directory(self):
         """打开结果目录"""
         dir_path = os.path.dirname(self.final_config["file_path"])
@@ -665,6 +980,10 @@ class ConfigWindow:
                 for key in self.entries:
                     self.entries[key].delete(0, tk.END)
                     self.entries[key].insert(0, config.get(key, ""))
+                self.extra_pairs_entry.delete(0, tk.END)
+                self.extra_pairs_entry.insert(
+                    0, format_column_pairs_text(config.get("extra_pairs", []))
+                )
                 self.auto_save_var.set(config.get("auto_save", False))
                 self.time_format_var.set(config.get("time_format", "小时时间格式"))
                 self.day_calc_var.set(config.get("day_calc", False))
@@ -672,6 +991,15 @@ class ConfigWindow:
                     config.get("open_dir", True)
                 )  # 新增：加载打开目录设置
                 self.topmost_var.set(config.get("topmost", True))  # 新增：加载置顶设置
+                self.summary_var.set(config.get("summary_sheet", False))
+                self.check_overlap_var.set(config.get("check_overlap", False))
+                self.exceptions_output_var.set(
+                    config.get("exceptions_output", "不输出")
+                )
+                self.use_cache_var.set(config.get("use_cache", True))
+                self.output_mode_var.set(config.get("output_mode", OUTPUT_MODES[0]))
+                self.split_dates_entry.delete(0, tk.END)
+                self.split_dates_entry.insert(0, config.get("split_dates", ""))
 
                 # 强制设置表名（新增修复点）
                 if self.original_sheet_name:
@@ -721,210 +1049,1478 @@ class ConfigWindow:
         self.root.attributes("-topmost", self.topmost_var.get())
 
 
-def calculate_working_hours_vectorized(
-    starts, ends, time_format, work_periods, day_calc
-):
-    """计算工作小时数（动态时间段版本）"""
-    total_hours = np.empty(len(starts), dtype=object)
-    error_stats = {"空值记录": 0, "格式错误": 0, "时间倒置": 0, "零值记录": 0}
-    sunday_notes = {}  # 存储周日信息
+def result_filter_mask(results, filter_name, pair=None):
+    """按筛选条件（及可选的列对名称）返回结果记录的布尔掩码"""
+    total = len(results["hours"])
+    if filter_name == "无效记录":
+        mask = np.isnan(results["hours"])
+    elif filter_name == "零值记录":
+        mask = results["status"] == STATUS_NAMES.index("零值记录")
+    elif filter_name == "含周日记录":
+        mask = np.zeros(total, dtype=bool)
+        mask[list(results["sunday_notes"])] = True
+    else:
+        mask = np.ones(total, dtype=bool)
+    if pair is not None:
+        mask &= results["keys"]["列对"] == pair
+    return mask
+
+
+def format_time_cells(column, rows):
+    """将列式时间列中指定行格式化为显示文本（无法解析的保留原始文本）"""
+    times = column["times"][rows]
+    labels = np.asarray(
+        pd.DatetimeIndex(times).strftime("%Y-%m-%d %H:%M:%S"), dtype=object
+    )
+    return np.where(np.isnat(times), column["texts"][rows], labels)
+
+
+class ResultPane:
+    """主窗口中的处理结果面板：结果摘要 + 分页结果表格
+
+    直接读取 main_process 填充的内存结果数组，Treeview 中只保留当前一页的
+    条目，筛选与跳转均为数组运算，百万行结果下界面依然流畅。
+    多列对时同一行号对应每个列对各一条记录，跳转定位到当前视图中的第一条，
+    可先在"列对"中选定列对再跳转。
+    """
+
+    def __init__(self, parent):
+        self.results = None
+        self.index = np.arange(0)
+        self.page = 0
+
+        self.frame = ttk.LabelFrame(parent, text=" 处理结果 ", padding=10)
+        self._create_summary()
+        self._create_toolbar()
+        self._create_tree()
+        self._create_pager()
+
+    def _create_summary(self):
+        """结果摘要（替代原处理完成消息框）"""
+        frame = ttk.Frame(self.frame)
+        frame.pack(fill=tk.X)
+
+        self.summary_text = tk.Text(
+            frame, height=8, wrap=tk.WORD, relief=tk.FLAT, font=("微软雅黑", 9)
+        )
+        scroll = ttk.Scrollbar(
+            frame, orient=tk.VERTICAL, command=self.summary_text.yview
+        )
+        self.summary_text.configure(yscrollcommand=scroll.set, state=tk.DISABLED)
+        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.summary_text.pack(fill=tk.X)
+
+    def _create_toolbar(self):
+        """筛选、列对选择与行号跳转"""
+        frame = ttk.Frame(self.frame, padding=(0, 10, 0, 5))
+        frame.pack(fill=tk.X)
+
+        ttk.Label(frame, text="筛选:").pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar(value=RESULT_FILTERS[0])
+        filter_combobox = ttk.Combobox(
+            frame,
+            textvariable=self.filter_var,
+            values=RESULT_FILTERS,
+            width=12,
+            state="readonly",
+        )
+        filter_combobox.pack(side=tk.LEFT, padx=5)
+        filter_combobox.bind("<<ComboboxSelected>>", self.apply_filter)
 
-    for i in range(len(starts)):
-        sundays = []
-        try:
-            if pd.isnull(starts[i]) or pd.isnull(ends[i]):
-                error_stats["空值记录"] += 1
-                total_hours[i] = np.nan
-                continue
+        ttk.Label(frame, text="列对:").pack(side=tk.LEFT, padx=(10, 0))
+        self.pair_var = tk.StringVar(value=RESULT_ALL_PAIRS)
+        self.pair_combobox = ttk.Combobox(
+            frame, textvariable=self.pair_var, width=10, state="readonly"
+        )
+        self.pair_combobox.pack(side=tk.LEFT, padx=5)
+        self.pair_combobox.bind("<<ComboboxSelected>>", self.apply_filter)
 
-            start_time = pd.to_datetime(starts[i], errors="coerce")
-            end_time = pd.to_datetime(ends[i], errors="coerce")
+        ttk.Button(frame, text="跳转", command=self.jump_to_row).pack(
+            side=tk.RIGHT, padx=5
+        )
+        self.jump_entry = ttk.Entry(frame, width=10)
+        self.jump_entry.pack(side=tk.RIGHT)
+        self.jump_entry.bind("<Return>", lambda e: self.jump_to_row())
+        ttk.Label(frame, text="跳转到行号:").pack(side=tk.RIGHT, padx=5)
+
+    def _create_tree(self):
+        """结果表格（仅渲染当前页，列随每次结果的分组键变化）"""
+        frame = ttk.Frame(self.frame)
+        frame.pack(expand=True, fill=tk.BOTH)
+
+        self.tree = ttk.Treeview(frame, show="headings", height=15)
+        y_scroll = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.tree.yview)
+        x_scroll = ttk.Scrollbar(frame, orient=tk.HORIZONTAL, command=self.tree.xview)
+        self.tree.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set)
+        y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        x_scroll.pack(side=tk.BOTTOM, fill=tk.X)
+        self.tree.pack(expand=True, fill=tk.BOTH)
+        self.tree.bind("<Prior>", lambda e: self.show_page(self.page - 1))
+        self.tree.bind("<Next>", lambda e: self.show_page(self.page + 1))
+
+    def _create_pager(self):
+        """翻页按钮"""
+        frame = ttk.Frame(self.frame, padding=(0, 10, 0, 0))
+        frame.pack(fill=tk.X)
+
+        ttk.Button(frame, text="首页", command=lambda: self.show_page(0)).pack(
+            side=tk.LEFT, padx=2
+        )
+        ttk.Button(
+            frame, text="上一页", command=lambda: self.show_page(self.page - 1)
+        ).pack(side=tk.LEFT, padx=2)
+        self.page_label = ttk.Label(frame, foreground="#666")
+        self.page_label.pack(side=tk.LEFT, padx=10)
+        ttk.Button(
+            frame, text="末页", command=lambda: self.show_page(self.page_count() - 1)
+        ).pack(side=tk.RIGHT, padx=2)
+        ttk.Button(
+            frame, text="下一页", command=lambda: self.show_page(self.page + 1)
+        ).pack(side=tk.RIGHT, padx=2)
+
+    def load(self, results, summary_lines):
+        """载入一次处理的结果：刷新摘要、表格列与筛选条件"""
+        self.results = results
+
+        self.summary_text.configure(state=tk.NORMAL)
+        self.summary_text.delete("1.0", tk.END)
+        self.summary_text.insert("1.0", "\n".join(summary_lines).strip())
+        self.summary_text.configure(state=tk.DISABLED)
+
+        pairs = results["keys"].get("列对")
+        pair_labels = list(dict.fromkeys(pairs.tolist())) if pairs is not None else []
+        self.pair_combobox.configure(
+            values=[RESULT_ALL_PAIRS, *pair_labels],
+            state="readonly" if pair_labels else tk.DISABLED,
+        )
+        self.pair_var.set(RESULT_ALL_PAIRS)
+        self.filter_var.set(RESULT_FILTERS[0])
+
+        columns = [
+            "行号",
+            *results["keys"],
+            "开始时间",
+            "结束时间",
+            "工时",
+            "状态",
+            "周日",
+        ]
+        self.tree.configure(columns=columns)
+        for name in columns:
+            self.tree.heading(name, text=name)
+            width = 150 if name in ("开始时间", "结束时间", "周日") else 80
+            self.tree.column(name, width=width, anchor="center")
+        self.apply_filter()
+
+    def page_count(self):
+        """当前筛选结果的总页数"""
+        return max(1, -(-len(self.index) // RESULT_PAGE_SIZE))
+
+    def page_values(self, rows):
+        """生成指定记录的表格行"""
+        results = self.results
+        hours = [
+            str(format_time(value, results["time_format"]))
+            for value in results["hours"][rows]
+        ]
+        sundays = [", ".join(results["sunday_notes"].get(int(i), [])) for i in rows]
+        return zip(
+            results["row_numbers"][rows].tolist(),
+            *(values[rows].tolist() for values in results["keys"].values()),
+            format_time_cells(results["start_column"], rows),
+            format_time_cells(results["end_column"], rows),
+            hours,
+            np.asarray(STATUS_NAMES)[results["status"][rows]],
+            sundays,
+        )
 
-            if pd.isnull(start_time) or pd.isnull(end_time):
-                error_stats["格式错误"] += 1
-                total_hours[i] = np.nan
-                continue
+    def show_page(self, page):
+        """渲染指定页（越界时停在首页/末页）"""
+        self.page = min(max(page, 0), self.page_count() - 1)
+        rows = self.index[
+            self.page * RESULT_PAGE_SIZE : (self.page + 1) * RESULT_PAGE_SIZE
+        ]
+        self.tree.delete(*self.tree.get_children())
+        for i, values in zip(rows, self.page_values(rows)):
+            self.tree.insert("", tk.END, iid=str(i), values=values)
+        self.page_label.configure(
+            text=f"第 {self.page + 1}/{self.page_count()} 页（共 {len(self.index)} 条）"
+        )
 
-            if start_time >= end_time:
-                error_stats["时间倒置"] += 1
-                total_hours[i] = np.nan
-                continue
+    def apply_filter(self, event=None):
+        """按筛选条件与列对重建记录索引并回到首页"""
+        if self.results is None:
+            return
+        pair = self.pair_var.get()
+        self.index = np.flatnonzero(
+            result_filter_mask(
+                self.results,
+                self.filter_var.get(),
+                None if pair == RESULT_ALL_PAIRS else pair,
+            )
+        )
+        self.show_page(0)
 
-            current = start_time.to_pydatetime()
-            end_dt = end_time.to_pydatetime()
-            valid_hours = 0.0
-
-            temp_day = current.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_day = end_dt.replace(hour=23, minute=59, second=59, microsecond=999999)
-
-            while temp_day <= end_day:
-                if temp_day.weekday() == 6:
-                    sundays.append(temp_day.strftime("%m-%d"))
-                temp_day += timedelta(days=1)
-
-            if day_calc:
-                # 按一天24小时计算
-                valid_hours = (end_dt - current).total_seconds() / 3600
-                # 排除周日的时间
-                temp = current
-                while temp <= end_dt:
-                    if temp.weekday() == 6:
-                        sunday_start = temp.replace(
-                            hour=0, minute=0, second=0, microsecond=0
-                        )
-                        sunday_end = temp.replace(
-                            hour=23, minute=59, second=59, microsecond=999999
-                        )
-                        # 计算周日的时间差
-                        sunday_duration = min(end_dt, sunday_end) - max(
-                            current, sunday_start
-                        )
-                        valid_hours -= sunday_duration.total_seconds() / 3600
-                    temp += timedelta(days=1)
-            else:
-                # 按时间段计算
-                while current < end_dt:
-                    if current.weekday() == 6:
-                        current = current.replace(hour=8, minute=30) + timedelta(days=1)
-                        continue
-
-                    day_start = current.replace(
-                        hour=0, minute=0, second=0, microsecond=0
-                    )
-                    day_end = day_start + timedelta(days=1)
+    def jump_to_row(self):
+        """跳转到指定Excel行号所在页并选中该行（当前视图中的第一条）"""
+        if self.results is None:
+            return
+        try:
+            row_num = int(self.jump_entry.get().strip())
+        except ValueError:
+            messagebox.showerror("输入错误", "请输入有效的行号")
+            return
+        positions = np.flatnonzero(self.results["row_numbers"][self.index] == row_num)
+        if len(positions) == 0:
+            messagebox.showinfo("未找到", f"第 {row_num} 行不在当前筛选结果中")
+            return
+        self.show_page(positions[0] // RESULT_PAGE_SIZE)
+        item = str(self.index[positions[0]])
+        self.tree.selection_set(item)
+        self.tree.see(item)
+
+
+CompiledSchedule = namedtuple(
+    "CompiledSchedule",
+    [
+        "fingerprint",  # 由以下配置字段生成的指纹，也是磁盘缓存的键
+        "periods",  # ((开始分钟, 结束分钟), ...)，按天计算模式下为整天
+        "rest_days",  # 休息日（Python weekday）
+        "day_calc",
+        "time_format",
+        "weekday_offsets",  # 按 weekday 排列的各天工作时段分钟偏移，休息日为空
+        "weekday_minutes",  # 按 weekday 排列的各天工作分钟数
+        "cum_before",  # 按纪元星期顺序，一周内该天之前的累计工作分钟数
+        "week_minutes",
+    ],
+)
+
+
+def schedule_periods(work_periods, day_calc):
+    """将工作时间段换算为 ((开始分钟, 结束分钟), ...)"""
+    if day_calc:
+        return ((0, 1440),)
+    return tuple(
+        (s.hour * 60 + s.minute, e.hour * 60 + e.minute) for s, e in work_periods
+    )
+
+
+def schedule_fingerprint(periods, rest_days, day_calc, time_format):
+    """作息配置指纹：不同配置的编译结果绝不会共用同一缓存条目"""
+    identity = [SCHEDULE_VERSION, periods, rest_days, day_calc, time_format]
+    return hashlib.sha1(
+        json.dumps(identity, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+def compile_schedule(
+    work_periods, day_calc, time_format="小时时间格式", rest_days=REST_DAYS
+):
+    """将工作时间段编译为不可变、可哈希的作息表
+
+    周日等休息日不计工时；按天计算模式下其余每天按24小时计。
+    编译结果供 cumulative_work_seconds 做向量化查表使用。
+    """
+    periods = schedule_periods(work_periods, day_calc)
+    rest_days = tuple(sorted(rest_days))
+    day_minutes = sum(end - start for start, end in periods)
+
+    weekday_offsets = tuple(
+        () if weekday in rest_days else periods for weekday in range(7)
+    )
+    weekday_minutes = tuple(
+        0 if weekday in rest_days else day_minutes for weekday in range(7)
+    )
+    # 1970-01-01 为周四：第 n 天（自纪元起）的星期为 (n + 3) % 7
+    epoch_order = [weekday_minutes[(i + 3) % 7] for i in range(7)]
+    cum_before = tuple(int(v) for v in np.cumsum([0] + epoch_order[:-1]))
+
+    return CompiledSchedule(
+        fingerprint=schedule_fingerprint(periods, rest_days, day_calc, time_format),
+        periods=periods,
+        rest_days=rest_days,
+        day_calc=day_calc,
+        time_format=time_format,
+        weekday_offsets=weekday_offsets,
+        weekday_minutes=weekday_minutes,
+        cum_before=cum_before,
+        week_minutes=sum(weekday_minutes),
+    )
+
+
+def _deep_tuple(value):
+    """将JSON读回的嵌套列表还原为元组"""
+    if isinstance(value, list):
+        return tuple(_deep_tuple(v) for v in value)
+    return value
+
+
+def read_schedule_cache(fingerprint):
+    """从磁盘缓存读取作息表，缺失、损坏或指纹不符时返回None"""
+    schedule_path = os.path.join(SCHEDULE_CACHE_DIR, f"{fingerprint}.json")
+    try:
+        with open(schedule_path, "r", encoding="utf-8") as f:
+            schedule = CompiledSchedule(
+                **{k: _deep_tuple(v) for k, v in json.load(f).items()}
+            )
+    except (OSError, ValueError, TypeError):
+        return None
+    expected = schedule_fingerprint(
+        schedule.periods, schedule.rest_days, schedule.day_calc, schedule.time_format
+    )
+    if schedule.fingerprint != fingerprint or expected != fingerprint:
+        return None
+    return schedule
+
+
+def write_schedule_cache(schedule):
+    """将作息表以JSON写入磁盘缓存（先写临时文件再替换）"""
+    schedule_path = os.path.join(SCHEDULE_CACHE_DIR, f"{schedule.fingerprint}.json")
+    temp_path = f"{schedule_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(SCHEDULE_CACHE_DIR, exist_ok=True)
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(schedule._asdict(), f, ensure_ascii=False)
+        os.replace(temp_path, schedule_path)
+    except OSError:
+        pass
+
+
+def load_schedule(config):
+    """读取已编译的作息表：进程内 → 磁盘缓存 → 现场编译
+
+    服务与批处理的工作进程按配置指纹复用同一作息表，不必为每个文件
+    重新编译；作息表只有几百字节，不受"启用解析缓存"开关影响。
+    """
+    fingerprint = schedule_fingerprint(
+        schedule_periods(config["work_periods"], config["day_calc"]),
+        REST_DAYS,
+        config["day_calc"],
+        config["time_format"],
+    )
+    schedule = _compiled_schedules.get(fingerprint)
+    if schedule is None:
+        schedule = read_schedule_cache(fingerprint)
+    if schedule is None:
+        schedule = compile_schedule(
+            config["work_periods"], config["day_calc"], config["time_format"]
+        )
+        write_schedule_cache(schedule)
+    _compiled_schedules[fingerprint] = schedule
+    return schedule
+
+
+@lru_cache(maxsize=32)
+def schedule_arrays(schedule):
+    """展开为查表用的数组（秒）：按 weekday 对齐、补零到相同时段数的
+    开始偏移与时长矩阵，以及按纪元星期顺序的累计表"""
+    width = max(1, max(len(offsets) for offsets in schedule.weekday_offsets))
+    starts = np.zeros((7, width))
+    lengths = np.zeros((7, width))
+    for weekday, offsets in enumerate(schedule.weekday_offsets):
+        for j, (start, end) in enumerate(offsets):
+            starts[weekday, j] = start * 60
+            lengths[weekday, j] = (end - start) * 60
+    return starts, lengths, np.asarray(schedule.cum_before, dtype=float) * 60
+
+
+def cumulative_work_seconds(times, schedule):
+    """计算自1970-01-01起至各时刻的累计工作秒数（单调不减）
+
+    任意区间 [a, b) 内的工作时长即为 F(b) - F(a)。
+    """
+    starts, lengths, cum_before = schedule_arrays(schedule)
+    ns = np.asarray(times, dtype="datetime64[ns]").astype(np.int64)
+    days = ns // NS_PER_DAY
+    seconds_of_day = (ns - days * NS_PER_DAY) / 1e9
+    weekdays = (days + 3) % 7
+
+    within_day = np.clip(
+        seconds_of_day[:, None] - starts[weekdays], 0, lengths[weekdays]
+    ).sum(axis=1)
+
+    return (
+        (days // 7) * (schedule.week_minutes * 60.0) + cum_before[days % 7] + within_day
+    )
+
+
+def parse_local_time(value):
+    """解析单个值；带时区偏移的时间去掉偏移，保留其本地钟面时间"""
+    parsed = pd.to_datetime(value, errors="coerce")
+    if parsed is not pd.NaT and parsed.tzinfo is not None:
+        parsed = parsed.tz_localize(None)
+    return parsed
+
+
+def parse_time_values(values):
+    """将原始单元格值批量解析为datetime64数组（无法解析的为NaT）
+
+    带时区偏移的时间按其本地钟面时间计算，不换算为UTC。
+    """
+    series = pd.Series(values, dtype=object)
+    try:
+        parsed = pd.to_datetime(series, errors="coerce", format="mixed")
+    except (TypeError, ValueError):
+        # 混合时区、有无时区混用等批量解析失败的情况逐个解析
+        parsed = pd.Series([parse_local_time(v) for v in series], dtype=object)
+        parsed = pd.to_datetime(parsed, errors="coerce")
+    if isinstance(parsed.dtype, pd.DatetimeTZDtype):
+        parsed = parsed.dt.tz_localize(None)
+    return parsed.to_numpy(dtype="datetime64[ns]")
+
+
+def parse_time_column(values):
+    """将一列原始单元格值解析为列式结构
+
+    返回 {"times": datetime64数组, "nulls": 空值掩码, "texts": 无法解析的
+    非空单元格的原始文本（其余为空串）}。texts 保持为object数组，避免个别超长
+    文本把整列撑成定长宽字符数组；落盘缓存时再稀疏存储。
+    """
+    values = np.asarray(values, dtype=object)
+    nulls = pd.isnull(values)
+    times = parse_time_values(values)
+    texts = np.full(len(values), "", dtype=object)
+    unparsed = ~nulls & np.isnat(times)
+    texts[unparsed] = pd.Series(values[unparsed], dtype=object).astype(str).to_numpy()
+    return {"times": times, "nulls": nulls, "texts": texts}
+
+
+def as_time_column(values):
+    """接受原始值数组或 parse_time_column 的结果，统一返回列式结构"""
+    if isinstance(values, dict):
+        return values
+    return parse_time_column(values)
+
+
+def concat_time_columns(columns):
+    """按行首尾相接合并多个列式时间列"""
+    return {
+        part: np.concatenate([column[part] for column in columns])
+        for part in TIME_COLUMN_PARTS
+    }
+
+
+def list_sundays(start_times, end_times):
+    """批量列出每条记录跨越的周日（返回 {行下标: ["MM-DD", ...]}）"""
+    start_days = start_times.astype("datetime64[D]").astype(np.int64)
+    end_days = end_times.astype("datetime64[D]").astype(np.int64)
+
+    first_sunday = start_days + (3 - start_days) % 7
+    counts = np.where(first_sunday <= end_days, (end_days - first_sunday) // 7 + 1, 0)
+    rows = np.flatnonzero(counts)
+    if len(rows) == 0:
+        return {}
+
+    repeated = np.repeat(rows, counts[rows])
+    offsets = np.arange(len(repeated)) - np.repeat(
+        np.cumsum(counts[rows]) - counts[rows], counts[rows]
+    )
+    sunday_days = first_sunday[repeated] + offsets * 7
+    labels = pd.DatetimeIndex(sunday_days.astype("datetime64[D]")).strftime("%m-%d")
+    groups = np.split(np.asarray(labels), np.cumsum(counts[rows])[:-1])
+    return {int(row): list(group) for row, group in zip(rows, groups)}
+
+
+def classify_records(starts, ends):
+    """一次性解析开始/结束时间并生成各类异常的布尔掩码
+
+    starts/ends 可为原始值数组或 parse_time_column 的结果。
+    返回 (开始时间数组, 结束时间数组, 状态掩码字典)，掩码互斥，
+    不属于任何掩码的记录即为可计算的有效记录。
+    """
+    start_column = as_time_column(starts)
+    end_column = as_time_column(ends)
+    null_mask = start_column["nulls"] | end_column["nulls"]
+    start_times = start_column["times"]
+    end_times = end_column["times"]
+    format_mask = ~null_mask & (np.isnat(start_times) | np.isnat(end_times))
+    inverted_mask = ~null_mask & ~format_mask & (start_times >= end_times)
+
+    status = {
+        "空值记录": null_mask,
+        "格式错误": format_mask,
+        "时间倒置": inverted_mask,
+    }
+    return start_times, end_times, status
+
+
+def compute_working_hours(starts, ends, schedule):
+    """计算原始工作小时数（schedule 为 compile_schedule/load_schedule 的结果）
+
+    返回 (工时float数组（无效记录为NaN）, 状态掩码字典, 周日信息)。
+    状态掩码包含 空值记录/格式错误/时间倒置/零值记录 四类。
+    """
+    start_times, end_times, status = classify_records(starts, ends)
+    total_hours = np.full(len(start_times), np.nan, dtype=float)
+    valid = ~(status["空值记录"] | status["格式错误"] | status["时间倒置"])
+
+    total_hours[valid] = (
+        cumulative_work_seconds(end_times[valid], schedule)
+        - cumulative_work_seconds(start_times[valid], schedule)
+    ) / 3600
+    status["零值记录"] = valid & (total_hours <= 0)
+
+    valid_rows = np.flatnonzero(valid)
+    sunday_notes = {
+        int(valid_rows[i]): sundays
+        for i, sundays in list_sundays(start_times[valid], end_times[valid]).items()
+    }
+    return total_hours, status, sunday_notes
+
+
+def detect_overlaps(start_times, end_times, valid, keys, schedule):
+    """按分组键排序后一次扫描，找出与同键较早记录时间重叠的记录（O(n log n)）
+
+    返回 (overlap_hours, partners, dedup_hours)，均与记录一一对应：
+    overlap_hours 为与同键此前记录重叠部分的工时（无效记录为NaN）；
+    partners 为重叠对象（此前结束最晚的记录）的下标，不重叠为-1；
+    dedup_hours 为去除重叠后该记录贡献的工时，按键求和即去重后的总工时。
+    分组键为空的记录无法归属到具体人员，不参与比较，按原工时计入。
+    """
+
+    def work(ns):
+        return cumulative_work_seconds(ns.astype("datetime64[ns]"), schedule)
+
+    n = len(start_times)
+    overlap_hours = np.full(n, np.nan)
+    dedup_hours = np.full(n, np.nan)
+    partners = np.full(n, -1, dtype=np.int64)
+
+    keyed = np.asarray(valid, dtype=bool).copy()
+    for values in keys.values():
+        keyed &= np.asarray(values) != ""
+    unkeyed = np.flatnonzero(valid & ~keyed)
+    overlap_hours[unkeyed] = 0.0
+    dedup_hours[unkeyed] = (
+        work(end_times[unkeyed]) - work(start_times[unkeyed])
+    ) / 3600
+
+    rows = np.flatnonzero(keyed)
+    if len(rows) == 0:
+        return overlap_hours, partners, dedup_hours
+
+    key_names = list(keys)
+    groups = (
+        pd.DataFrame({name: np.asarray(keys[name])[rows] for name in key_names})
+        .groupby(key_names, sort=False)
+        .ngroup()
+        .to_numpy()
+        if key_names
+        else np.zeros(len(rows), dtype=np.int64)
+    )
+    starts = start_times[rows].astype("datetime64[ns]").astype(np.int64)
+    ends = end_times[rows].astype("datetime64[ns]").astype(np.int64)
+    order = np.lexsort((ends, starts, groups))
+    rows, groups, starts, ends = rows[order], groups[order], starts[order], ends[order]
+
+    # 组内截至当前记录的最晚结束时间，及持有该结束时间的记录位置
+    running_end = pd.Series(ends).groupby(groups).cummax().to_numpy()
+    holder = np.maximum.accumulate(
+        np.where(ends == running_end, np.arange(len(ends)), -1)
+    )
+    first_in_group = np.r_[True, groups[1:] != groups[:-1]]
+    previous_end = np.r_[np.iinfo(np.int64).min, running_end[:-1]]
+    previous_end[first_in_group] = np.iinfo(np.int64).min
+    previous_holder = np.r_[-1, holder[:-1]]
+
+    overlapped = starts < previous_end
+    start_work = work(starts)
+    end_work = work(ends)
+    covered_until = work(np.maximum(starts, previous_end))
+    clipped_end = work(np.minimum(ends, np.maximum(starts, previous_end)))
+
+    overlap_hours[rows] = (clipped_end - start_work) / 3600
+    dedup_hours[rows] = np.clip(end_work - covered_until, 0, None) / 3600
+    partners[rows[overlapped]] = rows[previous_holder[overlapped]]
+    return overlap_hours, partners, dedup_hours
+
+
+def count_status(status):
+    """将状态掩码汇总为异常计数"""
+    return {name: int(mask.sum()) for name, mask in status.items()}
+
+
+def status_codes(status):
+    """将状态掩码合并为逐行状态码（0 为正常，其余为 STATUS_NAMES 中的序号）"""
+    return np.select(
+        [status[name] for name in STATUS_NAMES[1:]],
+        np.arange(1, len(STATUS_NAMES)),
+        default=0,
+    ).astype(np.int8)
+
+
+def build_exception_report(starts, ends, status, keys, row_numbers):
+    """批量列出所有异常记录的行号、原始开始/结束值与原因
+
+    row_numbers 为与记录一一对应的Excel行号数组。
+    """
+    codes = status_codes(status)
+    rows = np.flatnonzero(codes)
+
+    def raw_column(values):
+        column = as_time_column(values)
+        shown = column["times"][rows].astype("datetime64[us]").astype(object)
+        texts = column["texts"][rows]
+        shown[texts != ""] = texts[texts != ""]
+        shown[column["nulls"][rows]] = None
+        return shown
+
+    return pd.DataFrame(
+        {"行号": np.asarray(row_numbers)[rows]}
+        | {name: values[rows] for name, values in keys.items()}
+        | {
+            "开始时间": raw_column(starts),
+            "结束时间": raw_column(ends),
+            "原因": np.asarray(STATUS_NAMES, dtype=object)[codes[rows]],
+        }
+    )
+
+
+def split_working_hours(starts, ends, boundaries, schedule):
+    """按结算分割时刻拆分每条记录的工作小时数
+
+    boundaries 为升序的分割时刻，拆分出 len(boundaries)+1 个区间：
+    (-∞, b0), [b0, b1), ..., [bn, +∞)。计算规则与 compute_working_hours
+    一致，各区间之和等于整条记录的工时；无效记录整行为NaN。
+    """
+    start_times, end_times, status = classify_records(starts, ends)
+    valid = ~(status["空值记录"] | status["格式错误"] | status["时间倒置"])
+
+    cuts = cumulative_work_seconds(
+        np.asarray(boundaries, dtype="datetime64[ns]"), schedule
+    )
+    lower = np.concatenate(([-np.inf], cuts))
+    upper = np.concatenate((cuts, [np.inf]))
+
+    split = np.full((len(start_times), len(cuts) + 1), np.nan)
+    start_work = cumulative_work_seconds(start_times[valid], schedule)[:, None]
+    end_work = cumulative_work_seconds(end_times[valid], schedule)[:, None]
+    split[valid] = (
+        np.clip(np.minimum(end_work, upper) - np.maximum(start_work, lower), 0, None)
+        / 3600
+    )
+    return split
+
+
+def window_labels(boundaries):
+    """生成结算区间名称，如 "2024-01-26~2024-02-26" """
+    names = [pd.Timestamp(b).strftime("%Y-%m-%d") for b in boundaries]
+    return (
+        [f"~{names[0]}"]
+        + [f"{a}~{b}" for a, b in zip(names[:-1], names[1:])]
+        + [f"{names[-1]}~"]
+    )
+
+
+def format_hours_column(total_hours, time_format):
+    """按时间格式格式化工时数组"""
+    formatted_hours = []
+    for hours in total_hours:
+        if pd.isnull(hours):
+            formatted_hours.append(np.nan)
+        else:
+            formatted_hours.append(format_time(hours, time_format))
+    return pd.Series(formatted_hours).astype(object)
+
+
+def normalize_key_values(values):
+    """将分组键列统一为文本（整数型浮点去掉小数部分，空值为空串）"""
+    series = pd.Series(values, dtype=object)
+    integral = series.map(lambda v: isinstance(v, float) and v.is_integer())
+    text = series.where(series.notna(), "").astype(str)
+    text[integral] = series[integral].astype("int64").astype(str)
+    return text.to_numpy(dtype=object)
+
+
+def build_hours_summary(total_hours, start_times, keys, dedup_hours=None):
+    """按分组键与自然月汇总工时（基于工时数组的向量化分组）
+
+    start_times 为开始时间的datetime64数组（按其所在月份归类）；
+    keys 为 {表头: 键值数组} 的有序字典，可为空（仅按月汇总）；
+    给出 dedup_hours（见 detect_overlaps）时增加去重工时列。
+    """
+    total_hours = np.asarray(total_hours, dtype=float)
+    months = pd.Series(np.asarray(start_times, dtype="datetime64[ns]")).dt.strftime(
+        "%Y-%m"
+    )
+
+    key_names = list(keys)
+    frame = pd.DataFrame({name: keys[name] for name in key_names})
+    frame["月份"] = months.fillna("未知").to_numpy(dtype=object)
+    frame["_order"] = np.where(months.isna().to_numpy(), 1, 0)
+    frame["_hours"] = total_hours
+    frame["_zero"] = total_hours == 0
+    frame["_invalid"] = np.isnan(total_hours)
+
+    aggregations = {
+        "总工时(小时)": ("_hours", "sum"),
+        "记录数": ("_hours", "size"),
+        "零值记录": ("_zero", "sum"),
+        "无效记录": ("_invalid", "sum"),
+    }
+    if dedup_hours is not None:
+        frame["_dedup"] = dedup_hours
+        aggregations["去重工时(小时)"] = ("_dedup", "sum")
+    summary = (
+        frame.groupby(key_names + ["_order", "月份"], sort=False)
+        .agg(**aggregations)
+        .reset_index()
+    )
+    if key_names:
+        totals = frame.groupby(key_names, sort=False).agg(**aggregations).reset_index()
+        totals["_order"] = 2
+        totals["月份"] = "合计"
+        summary = pd.concat([summary, totals], ignore_index=True)
+
+    summary = summary.sort_values(key_names + ["_order", "月份"], kind="stable")
+    summary["总工时(小时)"] = summary["总工时(小时)"].round(2)
+    if dedup_hours is not None:
+        summary["去重工时(小时)"] = summary["去重工时(小时)"].round(2)
+    return summary.drop(columns="_order").reset_index(drop=True)
+
+
+def exception_csv_path(file_path):
+    """异常记录CSV文件路径（与源文件同目录）"""
+    stem = os.path.splitext(file_path)[0]
+    return f"{stem}_{EXCEPTION_SHEET_NAME}.csv"
+
+
+def result_file_path(file_path):
+    """独立结果文件路径（与源文件同目录）"""
+    stem = os.path.splitext(file_path)[0]
+    return f"{stem}_{RESULT_SHEET_NAME}.xlsx"
+
+
+def output_file_path(config):
+    """本次计算实际写入的文件：独立结果文件模式下源文件保持不变"""
+    if config.get("output_mode") == "独立结果文件":
+        return result_file_path(config["file_path"])
+    return config["file_path"]
+
+
+def write_result_rows(wb, row_numbers, keys, work_hours, codes, sunday_notes):
+    """以追加方式写出逐行结果（行号、分组键、工时、状态、周日说明）
+
+    仅使用 append，可配合 write_only 工作簿流式写出，内存占用与行数无关。
+    """
+    ws = wb.create_sheet(RESULT_SHEET_NAME)
+    ws.append(["行号", *keys, "工时", "状态", "周日说明"])
+    status_names = np.asarray(STATUS_NAMES, dtype=object)[codes]
+    key_values = [values.tolist() for values in keys.values()]
+    for i, row_num in enumerate(row_numbers.tolist()):
+        hours = work_hours[i]
+        notes = sunday_notes.get(i)
+        ws.append(
+            [row_num]
+            + [values[i] for values in key_values]
+            + [
+                None if pd.isnull(hours) else hours,
+                status_names[i],
+                f"包含{len(notes)}个周日：{', '.join(notes)}" if notes else None,
+            ]
+        )
+    return ws
+
+
+def free_sheet_title(wb, title):
+    """返回工作簿中未被占用的工作表名（重名时追加序号，如 工时汇总(2)）"""
+    taken = {name.lower() for name in wb.sheetnames}
+    candidate, index = title, 1
+    while candidate.lower() in taken:
+        index += 1
+        suffix = f"({index})"
+        candidate = title[: 31 - len(suffix)] + suffix  # Excel工作表名最长31字符
+    return candidate
+
+
+def write_frame_to_sheet(wb, title, frame):
+    """将DataFrame写入新工作表（同名工作表已存在时改用带序号的新名称，不覆盖原表）"""
+    ws = wb.create_sheet(free_sheet_title(wb, title))
+    ws.append([str(col) for col in frame.columns])
+    for row in frame.to_numpy(dtype=object).tolist():
+        ws.append(row)
+    return ws
+
+
+def resolve_column_pairs(config):
+    """返回全部列对 [(开始列, 结束列, 写入列), ...]（均为0起始列号）"""
+    if config.get("column_pairs"):
+        return [tuple(pair) for pair in config["column_pairs"]]
+    if config["write_col"] is not None:
+        write_col = config["write_col"]
+    else:
+        write_col = config["end_col"] + 1
+    return [(config["start_col"], config["end_col"], write_col)]
 
-                    for start_t, end_t in work_periods:
-                        period_start = day_start.replace(
-                            hour=start_t.hour, minute=start_t.minute
-                        )
-                        period_end = day_start.replace(
-                            hour=end_t.hour, minute=end_t.minute
-                        )
 
-                        overlap_start = max(current, period_start)
-                        overlap_end = min(end_dt, period_end)
+def time_columns(config):
+    """所有列对涉及的时间列（去重、升序）"""
+    return sorted({col for pair in resolve_column_pairs(config) for col in pair[:2]})
 
-                        if overlap_start < overlap_end:
-                            delta = (overlap_end - overlap_start).total_seconds() / 3600
-                            valid_hours += delta
 
-                    current = day_end
+def _xml_tag(name):
+    """带 SpreadsheetML 命名空间的XML标签名"""
+    return f"{{{XLSX_MAIN_NS}}}{name}"
 
-            if valid_hours < 0:
-                valid_hours = 0.0
-                error_stats["零值记录"] += 1
-            elif valid_hours == 0:
-                error_stats["零值记录"] += 1
 
-            total_hours[i] = valid_hours
+def _zip_target(base_dir, target):
+    """将关系文件中的 Target 解析为压缩包内路径"""
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join(base_dir, target))
 
-            if sundays:
-                sunday_notes[i] = sundays
 
-        except Exception:
-            error_stats["格式错误"] += 1
-            total_hours[i] = np.nan
+def _read_rels(archive, rels_path, base_dir):
+    """读取 .rels 关系文件，返回 {关系ID: 压缩包内路径}"""
+    root = ET.fromstring(archive.read(rels_path))
+    return {
+        rel.get("Id"): _zip_target(base_dir, rel.get("Target"))
+        for rel in root.iter(f"{{{XLSX_REL_NS}}}Relationship")
+    }
 
-    formatted_hours = []
-    for hours in total_hours:
-        if pd.isnull(hours):
-            formatted_hours.append(np.nan)
-        else:
-            formatted_hours.append(format_time(hours, time_format))
 
-    return pd.Series(formatted_hours).astype(object), error_stats, sunday_notes
+def _locate_sheet(archive, sheet_name):
+    """定位工作表XML路径，返回 (工作表路径, 工作簿目录, 是否1904日期系统)"""
+    package_rels = ET.fromstring(archive.read("_rels/.rels"))
+    workbook_path = "xl/workbook.xml"
+    for rel in package_rels.iter(f"{{{XLSX_REL_NS}}}Relationship"):
+        if rel.get("Type", "").endswith("/officeDocument"):
+            workbook_path = rel.get("Target").lstrip("/")
+    base_dir = posixpath.dirname(workbook_path)
 
+    workbook = ET.fromstring(archive.read(workbook_path))
+    properties = workbook.find(_xml_tag("workbookPr"))
+    date1904 = properties is not None and properties.get("date1904") in ("1", "true")
+
+    sheets = workbook.find(_xml_tag("sheets")).findall(_xml_tag("sheet"))
+    if sheet_name is None:
+        view = workbook.find(f"{_xml_tag('bookViews')}/{_xml_tag('workbookView')}")
+        sheet = sheets[int(view.get("activeTab", 0)) if view is not None else 0]
+    else:
+        matches = [s for s in sheets if s.get("name") == sheet_name]
+        if not matches:
+            raise ValueError(f"工作表不存在: {sheet_name}")
+        sheet = matches[0]
+
+    rels_path = posixpath.join(
+        base_dir, "_rels", posixpath.basename(workbook_path) + ".rels"
+    )
+    rels = _read_rels(archive, rels_path, base_dir)
+    return rels[sheet.get(f"{{{XLSX_DOC_REL_NS}}}id")], base_dir, date1904
+
+
+def _date_style_ids(archive, base_dir):
+    """返回使用日期数字格式的单元格样式序号集合"""
+    styles_path = posixpath.join(base_dir, "styles.xml")
+    if styles_path not in archive.namelist():
+        return set()
+    styles = ET.fromstring(archive.read(styles_path))
+
+    custom_formats = {}
+    num_fmts = styles.find(_xml_tag("numFmts"))
+    if num_fmts is not None:
+        for fmt in num_fmts.findall(_xml_tag("numFmt")):
+            custom_formats[int(fmt.get("numFmtId"))] = fmt.get("formatCode", "")
+
+    date_ids = set()
+    cell_xfs = styles.find(_xml_tag("cellXfs"))
+    for index, xf in enumerate(
+        [] if cell_xfs is None else cell_xfs.findall(_xml_tag("xf"))
+    ):
+        fmt_id = int(xf.get("numFmtId", 0))
+        if fmt_id in custom_formats:
+            is_date = is_date_format(custom_formats[fmt_id])
+        elif fmt_id in BUILTIN_FORMATS:
+            is_date = is_date_format(BUILTIN_FORMATS[fmt_id])
+        else:
+            is_date = fmt_id in CJK_DATE_FORMAT_IDS
+        if is_date:
+            date_ids.add(index)
+    return date_ids
+
+
+def _read_shared_strings(archive, base_dir, needed):
+    """按需读取共享字符串：只保留 needed 中的序号，读到最大序号即停止"""
+    path = posixpath.join(base_dir, "sharedStrings.xml")
+    if not needed or path not in archive.namelist():
+        return {}
+
+    si_tag, t_tag, r_tag = _xml_tag("si"), _xml_tag("t"), _xml_tag("r")
+    last_needed = max(needed)
+    strings = {}
+    index = 0
+    with archive.open(path) as f:
+        for _, elem in ET.iterparse(f, events=("end",)):
+            if elem.tag != si_tag:
+                continue
+            if index in needed:
+                # 拼接正文与富文本片段，跳过拼音注释(rPh)
+                parts = []
+                for child in elem:
+                    if child.tag == t_tag:
+                        parts.append(child.text or "")
+                    elif child.tag == r_tag:
+                        parts.extend(t.text or "" for t in child.iter(t_tag))
+                strings[index] = "".join(parts)
+            elem.clear()
+            index += 1
+            if index > last_needed:
+                break
+    return strings
+
+
+def _excel_serials_to_datetimes(serials, date1904):
+    """批量将Excel日期序列值转换为时间（规则同 openpyxl.from_excel）"""
+    serials = np.asarray(serials, dtype=float)
+    days = np.floor(serials)
+    millis = np.round((serials - days) * SECONDS_PER_DAY * 1000)
+    if not date1904:
+        # 1900日期系统中不存在的1900-02-29之前的序列值需补一天
+        days = days + ((serials > 0) & (serials < 60))
+    epoch = np.datetime64(MAC_EPOCH if date1904 else WINDOWS_EPOCH, "ms")
+    converted = (
+        epoch + days.astype("timedelta64[D]") + millis.astype("timedelta64[ms]")
+    ).astype(object)
+
+    # 仅含时间部分（0 ≤ 值 < 1）的单元格按 openpyxl 规则返回 time 对象
+    time_only = (serials >= 0) & (serials < 1)
+    for i in np.flatnonzero(time_only):
+        converted[i] = from_excel(serials[i], MAC_EPOCH if date1904 else WINDOWS_EPOCH)
+    return converted
+
+
+def _scan_sheet_cells(stream, wanted, skiprows, date_styles):
+    """用 expat 增量解析工作表XML，只收集所需列的单元格
+
+    返回 (cells, 最后一个有数据的行号)，cells 为 {列号: [(行下标, 类型, 文本)]}。
+    """
+    cells = {col: [] for col in wanted.values()}
+    row_name, c_name, v_name, t_name = (
+        f"{XLSX_MAIN_NS}}}{tag}" for tag in ("row", "c", "v", "t")
+    )
+    row = position = last_data_row = 0
+    col, cell_type, capture, text = None, "n", False, []
+
+    def start(name, attrs):
+        nonlocal row, position, col, cell_type, capture, text
+        if name == c_name:
+            ref = attrs.get("r")
+            letters = (
+                ref.rstrip("0123456789") if ref else number_to_excel_column(position)
+            )
+            position += 1
+            col = wanted.get(letters) if row > skiprows else None
+            if col is not None:
+                cell_type = attrs.get("t", "n")
+                if cell_type == "n" and int(attrs.get("s", 0)) in date_styles:
+                    cell_type = "date"
+                text = []
+        elif name == v_name or name == t_name:
+            capture = True
+        elif name == row_name:
+            row = int(attrs.get("r") or row + 1)
+            position = 0
+
+    def end(name):
+        nonlocal col, capture
+        if name == v_name or name == t_name:
+            capture = False
+        elif name == c_name and col is not None:
+            if text:
+                cells[col].append((row - skiprows - 1, cell_type, "".join(text)))
+            col = None
+
+    def characters(data):
+        nonlocal last_data_row
+        if capture:
+            # 任意列出现非空值即视为该行有数据（与 pandas 截断尾部空行的规则一致）
+            last_data_row = row
+            if col is not None:
+                text.append(data)
+
+    parser = expat.ParserCreate(namespace_separator="}")
+    parser.buffer_text = True
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = characters
+    parser.ParseFile(stream)
+    return cells, last_data_row
+
+
+def read_xlsx_columns(file_path, sheet_name, columns, skiprows):
+    """流式读取xlsx中指定列（0起始列号）从 skiprows 行之后的单元格
+
+    用增量XML解析逐行扫描工作表，只转换所需列的单元格；共享字符串
+    与日期样式按需解析。行数与 pd.read_excel(header=None) 一致：截至
+    任意列有数据的最后一行。返回 {列号: object数组}。
+    """
+    wanted = {number_to_excel_column(col): col for col in columns}
+
+    with zipfile.ZipFile(file_path) as archive:
+        sheet_path, base_dir, date1904 = _locate_sheet(archive, sheet_name)
+        date_styles = _date_style_ids(archive, base_dir)
+
+        with archive.open(sheet_path) as f:
+            cells, last_data_row = _scan_sheet_cells(f, wanted, skiprows, date_styles)
+
+        needed = {
+            int(text)
+            for entries in cells.values()
+            for _, t, text in entries
+            if t == "s"
+        }
+        shared = _read_shared_strings(archive, base_dir, needed)
+
+    n_rows = max(0, last_data_row - skiprows)
+    result = {}
+    for col, entries in cells.items():
+        values = np.full(n_rows, None, dtype=object)
+        serial_rows, serials = [], []
+        for row, cell_type, text in entries:
+            if cell_type == "date":
+                serial_rows.append(row)
+                serials.append(float(text))
+            elif cell_type == "n":
+                number = float(text)
+                values[row] = int(number) if number.is_integer() else number
+            elif cell_type == "s":
+                values[row] = shared.get(int(text))
+            elif cell_type == "b":
+                values[row] = text == "1"
+            elif cell_type == "d":
+                values[row] = pd.Timestamp(text)
+            elif cell_type == "e":
+                values[row] = None
+            else:  # str / inlineStr
+                values[row] = text
+        if serials:
+            values[serial_rows] = _excel_serials_to_datetimes(serials, date1904)
+
+        # 与 pandas 默认缺失值规则一致：空串及 "NA"、"#N/A" 等文本视为空值
+        text_mask = np.array([isinstance(v, str) for v in values], dtype=bool)
+        na_rows = np.flatnonzero(text_mask)[
+            np.isin(values[text_mask].astype(str), EXCEL_NA_STRINGS)
+        ]
+        values[na_rows] = None
+        result[col] = values
+    return result
 
-def main_process(config):
-    """主处理函数"""
-    try:
-        sheet_name = config.get("sheet_name", None)
-        display_sheet_name = sheet_name if sheet_name else "活动工作表"
 
-        df = pd.read_excel(
+def read_input_snapshot(config):
+    """一次读取全部列对的时间列及分组键列，解析为列式快照"""
+    key_cols = config.get("key_cols", [])
+    usecols = sorted({*time_columns(config), *key_cols})
+    try:
+        raw = read_xlsx_columns(
+            config["file_path"], config.get("sheet_name"), usecols, config["skiprows"]
+        )
+    except zipfile.BadZipFile:
+        # 非xlsx压缩包格式（如旧版.xls）退回 pandas 读取
+        raw = pd.read_excel(
             config["file_path"],
-            sheet_name=sheet_name,
+            sheet_name=config.get("sheet_name") or 0,
             header=None,
             skiprows=config["skiprows"],
-            usecols=[config["start_col"], config["end_col"]],
-            names=["start_time", "end_time"],
-            engine="openpyxl",
+            usecols=usecols,
         )
+    return {
+        "columns": {col: parse_time_column(raw[col]) for col in time_columns(config)},
+        "keys": {
+            f"{number_to_excel_column(col)}列": normalize_key_values(raw[col])
+            for col in key_cols
+        },
+    }
+
+
+def file_fingerprint(file_path):
+    """文件指纹：绝对路径、大小、修改时间与内容哈希"""
+    stat = os.stat(file_path)
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return [
+        os.path.abspath(file_path),
+        stat.st_size,
+        stat.st_mtime_ns,
+        digest.hexdigest(),
+    ]
+
+
+def snapshot_cache_key(config, fingerprint):
+    """由快照版本、文件指纹与读取参数（表名、列、起始行）生成缓存键"""
+    identity = (
+        [SNAPSHOT_VERSION]
+        + fingerprint
+        + [
+            config.get("sheet_name"),
+            time_columns(config),
+            list(config.get("key_cols", [])),
+            config["skiprows"],
+        ]
+    )
+    return hashlib.sha1(
+        json.dumps(identity, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+def load_snapshot_from_cache(cache_key):
+    """从缓存加载快照（内存映射方式），未命中返回None"""
+    entry_dir = os.path.join(CACHE_DIR, cache_key)
+    meta_path = os.path.join(entry_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        mmap_mode = "r" if meta["rows"] > 0 else None
+
+        def load(name, mmap_mode=mmap_mode):
+            return np.load(os.path.join(entry_dir, f"{name}.npy"), mmap_mode=mmap_mode)
+
+        def load_texts(col):
+            # 文本稀疏存储：仅保存无法解析单元格的行下标与原文
+            texts = np.full(meta["rows"], "", dtype=object)
+            texts[load(f"col_{col}_text_rows", None)] = load(
+                f"col_{col}_text_values", None
+            ).astype(object)
+            return texts
+
+        def load_key(i):
+            # 分组键字典编码：取值表 + 每行编码
+            uniques = load(f"key_{i}_uniques", None).astype(object)
+            return uniques[load(f"key_{i}_codes")]
+
+        snapshot = {
+            "columns": {
+                col: {
+                    "times": load(f"col_{col}_times"),
+                    "nulls": load(f"col_{col}_nulls"),
+                    "texts": load_texts(col),
+                }
+                for col in meta["columns"]
+            },
+            "keys": {name: load_key(i) for i, name in enumerate(meta["keys"])},
+        }
+        os.utime(meta_path)  # 记录最近使用时间，供LRU淘汰
+        return snapshot
+    except (OSError, ValueError, KeyError):
+        return None
 
-        wb = load_workbook(config["file_path"])
-        if sheet_name is not None:
-            ws = wb[sheet_name]
-        else:
-            ws = wb.active
 
-        if config["write_col"] is not None:
-            insert_col = config["write_col"]
-        else:
-            insert_col = config["end_col"] + 1
-
-        target_col = get_column_letter(insert_col + 1)
-        conflict_range = f"{target_col}{config['skiprows']+1}:{target_col}{ws.max_row}"
-        conflict_values = [cell[0].value for cell in ws[conflict_range]]
-
-        if any(conflict_values):
-            conflict_cells = []
-            for i, val in enumerate(conflict_values, start=config["skiprows"] + 1):
-                if val is not None:
-                    conflict_cells.append(f"{target_col}{i}")
-                    if len(conflict_cells) >= 3:
-                        break
-
-            error_msg = [
-                f"■ 工作表：{display_sheet_name}",
-                f"目标列 {target_col} 存在数据冲突：",
-                f"发现 {sum(1 for v in conflict_values if v is not None)} 个非空单元格",
-                f"示例：{', '.join(conflict_cells)}...",
-                "\n请清空目标列或手动插入新列！",
-            ]
-            messagebox.showerror("数据冲突", "\n".join(error_msg))
-            return False, None
-
-        df["work_hours"], error_stats, sunday_notes = (
-            calculate_working_hours_vectorized(
-                df["start_time"],
-                df["end_time"],
-                config["time_format"],
-                config["work_periods"],
-                config["day_calc"],
+def save_snapshot_to_cache(cache_key, snapshot):
+    """将快照以.npy列文件写入缓存目录，并按容量上限淘汰最久未用的条目
+
+    缓存仅用于加速：目录无法创建或写入（如只读安装目录）时静默放弃。
+    """
+    entry_dir = os.path.join(CACHE_DIR, cache_key)
+    if os.path.exists(entry_dir):
+        return
+    temp_dir = f"{entry_dir}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(temp_dir, exist_ok=True)
+
+        def save(name, values):
+            np.save(os.path.join(temp_dir, f"{name}.npy"), values)
+
+        for col, column in snapshot["columns"].items():
+            save(f"col_{col}_times", column["times"])
+            save(f"col_{col}_nulls", column["nulls"])
+            text_rows = np.flatnonzero(column["texts"] != "")
+            save(f"col_{col}_text_rows", text_rows)
+            save(f"col_{col}_text_values", column["texts"][text_rows].astype(str))
+        for i, values in enumerate(snapshot["keys"].values()):
+            codes, uniques = pd.factorize(values)
+            save(f"key_{i}_codes", codes)
+            save(f"key_{i}_uniques", np.asarray(uniques, dtype=object).astype(str))
+        first_column = next(iter(snapshot["columns"].values()))
+        with open(os.path.join(temp_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "rows": len(first_column["times"]),
+                    "columns": list(snapshot["columns"]),
+                    "keys": list(snapshot["keys"]),
+                },
+                f,
+                ensure_ascii=False,
             )
+        os.replace(temp_dir, entry_dir)
+    except OSError:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return
+    try:
+        evict_snapshot_cache(keep=cache_key)
+    except OSError:
+        pass
+
+
+def evict_snapshot_cache(max_bytes=CACHE_MAX_BYTES, keep=None):
+    """按最近使用时间淘汰缓存条目，使缓存总大小不超过上限"""
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        entry_dir = os.path.join(CACHE_DIR, name)
+        meta_path = os.path.join(entry_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            continue
+        size = sum(
+            os.path.getsize(os.path.join(entry_dir, f)) for f in os.listdir(entry_dir)
         )
+        entries.append((os.path.getmtime(meta_path), size, name))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        if name == keep:
+            continue
+        shutil.rmtree(os.path.join(CACHE_DIR, name), ignore_errors=True)
+        total -= size
+
+
+def load_input_snapshot(config):
+    """读取输入快照：命中缓存时跳过xlsx解析
+
+    返回 (快照, 是否命中缓存)。
+    """
+    if not config.get("use_cache"):
+        return read_input_snapshot(config), False
+
+    cache_key = snapshot_cache_key(config, file_fingerprint(config["file_path"]))
+    snapshot = load_snapshot_from_cache(cache_key)
+    if snapshot is not None:
+        return snapshot, True
+
+    snapshot = read_input_snapshot(config)
+    save_snapshot_to_cache(cache_key, snapshot)
+    return snapshot, False
+
 
-        for i in range(len(df)):
-            row_num = config["skiprows"] + 1 + i
-            if not pd.isnull(df["work_hours"][i]):
-                cell = ws.cell(
-                    row=row_num, column=insert_col + 1, value=df["work_hours"][i]
+def main_process(config, on_error=None, results=None):
+    """主处理函数
+
+    on_error(title, message) 用于报告错误，默认弹出消息框；
+    给出 results 字典时，成功后填入逐行结果数组供结果浏览窗口使用。
+    """
+    if on_error is None:
+        on_error = messagebox.showerror
+    try:
+        sheet_name = config.get("sheet_name", None)
+        display_sheet_name = sheet_name if sheet_name else "活动工作表"
+
+        schedule = load_schedule(config)
+        snapshot, cache_hit = load_input_snapshot(config)
+        columns = snapshot["columns"]
+        pairs = resolve_column_pairs(config)
+        total = len(next(iter(columns.values()))["times"])
+        separate_output = config.get("output_mode") == "独立结果文件"
+        output_path = output_file_path(config)
+
+        if separate_output:
+            # 不打开源工作簿，结果以只写模式流式写入新文件
+            wb = Workbook(write_only=True)
+        else:
+            wb = load_workbook(config["file_path"])
+            if sheet_name is not None:
+                ws = wb[sheet_name]
+            else:
+                ws = wb.active
+
+            for _, _, insert_col in pairs:
+                target_col = get_column_letter(insert_col + 1)
+                conflict_range = (
+                    f"{target_col}{config['skiprows']+1}:{target_col}{ws.max_row}"
                 )
-                cell.alignment = Alignment(horizontal="right")
-                if i in sunday_notes:
-                    comment_text = f"包含{len(sunday_notes[i])}个周日：{', '.join(sunday_notes[i])}"
-                    cell.comment = Comment(comment_text, "系统提示")
-            elif pd.isnull(df["start_time"][i]) or pd.isnull(df["end_time"][i]):
-                ws.cell(row=row_num, column=insert_col + 1, value="")
+                conflict_values = [cell[0].value for cell in ws[conflict_range]]
+
+                if any(conflict_values):
+                    conflict_cells = []
+                    for i, val in enumerate(
+                        conflict_values, start=config["skiprows"] + 1
+                    ):
+                        if val is not None:
+                            conflict_cells.append(f"{target_col}{i}")
+                            if len(conflict_cells) >= 3:
+                                break
+
+                    error_msg = [
+                        f"■ 工作表：{display_sheet_name}",
+                        f"目标列 {target_col} 存在数据冲突：",
+                        f"发现 {sum(1 for v in conflict_values if v is not None)} 个非空单元格",
+                        f"示例：{', '.join(conflict_cells)}...",
+                        "\n请清空目标列或手动插入新列！",
+                    ]
+                    on_error("数据冲突", "\n".join(error_msg))
+                    return False, None
+
+        # 所有列对首尾相接成一批，一次计算
+        start_column = concat_time_columns([columns[pair[0]] for pair in pairs])
+        end_column = concat_time_columns([columns[pair[1]] for pair in pairs])
+        row_numbers = np.tile(np.arange(total) + config["skiprows"] + 1, len(pairs))
+        keys = {
+            name: np.tile(values, len(pairs))
+            for name, values in snapshot["keys"].items()
+        }
+        pair_labels = [
+            f"{number_to_excel_column(s)}-{number_to_excel_column(e)}"
+            for s, e, _ in pairs
+        ]
+        if len(pairs) > 1:
+            keys = {"列对": np.repeat(np.asarray(pair_labels), total)} | keys
+
+        raw_hours, status, sunday_notes = compute_working_hours(
+            start_column,
+            end_column,
+            schedule,
+        )
+        work_hours = format_hours_column(raw_hours, config["time_format"])
 
-        total = len(df)
-        valid = sum(~pd.isnull(df["work_hours"]))
+        if separate_output:
+            write_result_rows(
+                wb, row_numbers, keys, work_hours, status_codes(status), sunday_notes
+            )
+        else:
+            for i in range(len(raw_hours)):
+                row_num = row_numbers[i]
+                insert_col = pairs[i // total][2]
+                if not pd.isnull(work_hours[i]):
+                    cell = ws.cell(
+                        row=row_num, column=insert_col + 1, value=work_hours[i]
+                    )
+                    cell.alignment = Alignment(horizontal="right")
+                    if i in sunday_notes:
+                        notes = sunday_notes[i]
+                        comment_text = f"包含{len(notes)}个周日：{', '.join(notes)}"
+                        cell.comment = Comment(comment_text, "系统提示")
+                elif status["空值记录"][i]:
+                    ws.cell(row=row_num, column=insert_col + 1, value="")
 
         result_msg = [
             "■ 处理结果统计 ■",
             f"工作表名称：{display_sheet_name}",
-            f"总记录数：{total} 条",
-            f"✓ 有效记录：{valid} 条（含0值）",
-            f"○ 零值记录：{error_stats['零值记录']} 条",
-            f"✗ 无效记录：{total - valid} 条",
-            "■ 异常分布 ■",
-            f"空值记录：{error_stats['空值记录']} 条",
-            f"格式错误：{error_stats['格式错误']} 条",
-            f"时间倒置：{error_stats['时间倒置']} 条",
-            f"\n文件已保存：{os.path.basename(config['file_path'])} ({config['time_format']})",
         ]
+        for p, (label, (_, _, insert_col)) in enumerate(zip(pair_labels, pairs)):
+            part = slice(p * total, (p + 1) * total)
+            error_stats = count_status({k: v[part] for k, v in status.items()})
+            valid = int((~np.isnan(raw_hours[part])).sum())
+            if len(pairs) > 1 and separate_output:
+                result_msg.append(f"■ 列对 {label} ■")
+            elif len(pairs) > 1:
+                result_msg.append(
+                    f"■ 列对 {label} → {number_to_excel_column(insert_col)} ■"
+                )
+            result_msg += [
+                f"总记录数：{total} 条",
+                f"✓ 有效记录：{valid} 条（含0值）",
+                f"○ 零值记录：{error_stats['零值记录']} 条",
+                f"✗ 无效记录：{total - valid} 条",
+                "■ 异常分布 ■",
+                f"空值记录：{error_stats['空值记录']} 条",
+                f"格式错误：{error_stats['格式错误']} 条",
+                f"时间倒置：{error_stats['时间倒置']} 条",
+            ]
+        if cache_hit and separate_output:
+            result_msg.append("数据来源：解析缓存（跳过Excel解析）")
+        elif cache_hit:
+            # 写回模式仍需载入原工作簿写入结果，仅时间列解析来自缓存
+            result_msg.append("时间列来源：解析缓存（写回仍需载入原工作簿）")
+
+        dedup_hours = None
+        if config.get("check_overlap"):
+            overlap_hours, partners, dedup_hours = detect_overlaps(
+                start_column["times"],
+                end_column["times"],
+                ~np.isnan(raw_hours),
+                # 多列对时"列对"也是分组键：计划/实际等列对本就相互重叠
+                keys,
+                schedule,
+            )
+            flagged = np.flatnonzero(partners >= 0)
+            result_msg += [
+                "■ 重叠检查 ■",
+                f"重叠记录：{len(flagged)} 条",
+                f"重叠工时：{round(float(overlap_hours[flagged].sum()), 2)} 小时",
+                f"去重后总工时：{round(float(np.nansum(dedup_hours)), 2)} 小时"
+                f"（原 {round(float(np.nansum(raw_hours)), 2)} 小时）",
+            ]
+            if len(flagged):
+                overlaps = pd.DataFrame(
+                    {"行号": row_numbers[flagged]}
+                    | {name: values[flagged] for name, values in keys.items()}
+                    | {
+                        "开始时间": start_column["times"][flagged]
+                        .astype("datetime64[us]")
+                        .astype(object),
+                        "结束时间": end_column["times"][flagged]
+                        .astype("datetime64[us]")
+                        .astype(object),
+                        "重叠行号": row_numbers[partners[flagged]],
+                        "重叠工时(小时)": overlap_hours[flagged].round(2),
+                    }
+                )
+                ws = write_frame_to_sheet(wb, OVERLAP_SHEET_NAME, overlaps)
+                result_msg.append(f"重叠明细：{ws.title}（{len(overlaps)} 行）")
 
-        wb.save(config["file_path"])
+        if config.get("summary_sheet"):
+            summary = build_hours_summary(
+                raw_hours, start_column["times"], keys, dedup_hours
+            )
+            ws = write_frame_to_sheet(wb, SUMMARY_SHEET_NAME, summary)
+            result_msg.append(f"汇总表：{ws.title}（{len(summary)} 行）")
+
+        if config.get("split_boundaries"):
+            boundaries = config["split_boundaries"]
+            split = split_working_hours(
+                start_column,
+                end_column,
+                boundaries,
+                schedule,
+            )
+            rows, windows = np.nonzero(split > 0)
+            split_frame = pd.DataFrame(
+                {"行号": row_numbers[rows]}
+                | {name: values[rows] for name, values in keys.items()}
+                | {
+                    "结算区间": np.asarray(window_labels(boundaries))[windows],
+                    "工时(小时)": split[rows, windows].round(2),
+                }
+            )
+            ws = write_frame_to_sheet(wb, SPLIT_SHEET_NAME, split_frame)
+            result_msg.append(
+                f"分段工时：{ws.title}（{len(boundaries) + 1} 个区间，"
+                f"{len(split_frame)} 行）"
+            )
+
+        exceptions_output = config.get("exceptions_output", "不输出")
+        if exceptions_output != "不输出":
+            exceptions = build_exception_report(
+                start_column, end_column, status, keys, row_numbers
+            )
+            if exceptions_output == "CSV文件":
+                csv_path = exception_csv_path(config["file_path"])
+                exceptions.to_csv(csv_path, index=False, encoding="utf-8-sig")
+                target = os.path.basename(csv_path)
+            else:
+                target = write_frame_to_sheet(
+                    wb, EXCEPTION_SHEET_NAME, exceptions
+                ).title
+            result_msg.append(f"异常记录：{target}（{len(exceptions)} 行）")
+
+        result_msg.append(
+            f"\n文件已保存：{os.path.basename(output_path)} ({config['time_format']})"
+        )
+
+        wb.save(output_path)
+        if results is not None:
+            results.update(
+                row_numbers=row_numbers,
+                keys=keys,
+                start_column=start_column,
+                end_column=end_column,
+                hours=raw_hours,
+                status=status_codes(status),
+                sunday_notes=sunday_notes,
+                time_format=config["time_format"],
+            )
         return True, result_msg
 
     except Exception as e:
@@ -937,10 +2533,247 @@ def main_process(config):
             "3. 确保目标列（计算结果列）为空",
             "4. 验证工作表结构是否符合要求",
         ]
-        messagebox.showerror("运行错误", "\n".join(error_msg))
+        on_error("运行错误", "\n".join(error_msg))
         return False, None
 
 
+def run_service_job(config):
+    """在服务工作进程中执行一个计算任务，返回结果摘要与耗时"""
+    started = time.time()
+    errors = []
+    success, result_msg = main_process(
+        config, on_error=lambda title, message: errors.append(f"{title}：{message}")
+    )
+    return {
+        "success": success,
+        "summary": result_msg or [],
+        "errors": errors,
+        "started": started,
+        "finished": time.time(),
+    }
+
+
+class WorkingHoursService:
+    """服务模式的任务管理：有界工作进程池 + 任务队列 + 状态查询"""
+
+    def __init__(self, workers=SERVICE_WORKERS, max_pending=SERVICE_MAX_PENDING):
+        # spawn 方式启动的工作进程不会继承HTTP监听套接字，且与Windows行为一致
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.max_pending = max_pending
+        self.work_dir = tempfile.mkdtemp(prefix=f"{script_name}_service_")
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, payload):
+        """提交任务：payload 含 config（配置文件格式）与 base64 编码的 workbook"""
+        with self.lock:
+            self._check_capacity()  # 队列已满时尽早拒绝，免去解码与落盘
+
+        if not isinstance(payload, dict):
+            raise ValueError("请求体必须为JSON对象")
+        config = payload.get("config", {})
+        if not isinstance(config, dict):
+            raise ValueError("config 必须为JSON对象")
+        # 配置文件格式中的列标等字段均为文本，数字等值按文本处理
+        config = {
+            key: (
+                str(value)
+                if key in SERVICE_TEXT_FIELDS and value is not None
+                else value
+            )
+            for key, value in config.items()
+        }
+        workbook = base64.b64decode(payload["workbook"], validate=True)
+        file_name = os.path.basename(str(payload.get("file_name") or ""))
+        if file_name in ("", ".", ".."):
+            file_name = "workbook.xlsx"
+
+        job_id = uuid.uuid4().hex
+        job_dir = os.path.join(self.work_dir, job_id)
+        file_path = os.path.join(job_dir, file_name)
+        config["file_path"] = file_path
+        try:
+            os.makedirs(job_dir)
+            with open(file_path, "wb") as f:
+                f.write(workbook)
+            final_config = build_final_config(config)
+        except Exception:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise
+        # 上传文件路径每次不同，解析缓存无法复用；服务端也不打开目录
+        final_config.update({"open_dir": False, "use_cache": False})
+
+        with self.lock:
+            # 计数与登记在同一次加锁内完成，并发提交不会超出队列上限
+            try:
+                self._check_capacity()
+            except OverflowError:
+                shutil.rmtree(job_dir, ignore_errors=True)
+                raise
+            self.jobs[job_id] = {
+                "file_path": output_file_path(final_config),
+                "submitted": time.time(),
+                "future": self.executor.submit(run_service_job, final_config),
+            }
+            self._discard_old_jobs()
+        return job_id
+
+    def _check_capacity(self):
+        """未完成任务数达到上限时抛出 OverflowError（调用方需持有锁）"""
+        pending = sum(1 for job in self.jobs.values() if not job["future"].done())
+        if pending >= self.max_pending:
+            raise OverflowError("任务队列已满，请稍后重试")
+
+    def status(self, job_id):
+        """查询任务状态、结果摘要与耗时"""
+        job = self.jobs[job_id]
+        future = job["future"]
+        info = {"job_id": job_id}
+        if not future.done():
+            info["status"] = "running" if future.running() else "queued"
+            info["timing"] = {
+                "elapsed_seconds": round(time.time() - job["submitted"], 3)
+            }
+            return info
+
+        try:
+            result = future.result()
+        except Exception as e:
+            info.update({"status": "failed", "summary": [], "errors": [str(e)]})
+            return info
+
+        info["status"] = "done" if result["success"] else "failed"
+        info["summary"] = result["summary"]
+        info["errors"] = result["errors"]
+        info["timing"] = {
+            "queued_seconds": round(result["started"] - job["submitted"], 3),
+            "run_seconds": round(result["finished"] - result["started"], 3),
+            "total_seconds": round(result["finished"] - job["submitted"], 3),
+        }
+        return info
+
+    def result_path(self, job_id):
+        """已完成任务的结果工作簿路径，未完成或失败返回None"""
+        job = self.jobs[job_id]
+        if job["future"].done() and self.status(job_id)["status"] == "done":
+            return job["file_path"]
+        return None
+
+    def _discard_old_jobs(self):
+        """仅保留最近的已完成任务，删除更早任务的临时文件"""
+        finished = [
+            (job["submitted"], job_id)
+            for job_id, job in self.jobs.items()
+            if job["future"].done()
+        ]
+        for _, job_id in sorted(finished)[: max(0, len(finished) - SERVICE_KEEP_JOBS)]:
+            job = self.jobs.pop(job_id)
+            shutil.rmtree(os.path.dirname(job["file_path"]), ignore_errors=True)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """服务模式的HTTP/JSON接口
+
+    POST /jobs              提交任务，返回 job_id
+    GET  /jobs/<id>         查询状态、结果摘要与耗时
+    GET  /jobs/<id>/result  下载处理后的工作簿
+    """
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            return self._send_json(404, {"error": "接口不存在"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length).decode("utf-8"))
+            job_id = self.server.service.submit(payload)
+        except OverflowError as e:
+            return self._send_json(503, {"error": str(e)})
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            return self._send_json(400, {"error": str(e)})
+        except OSError as e:
+            return self._send_json(500, {"error": f"保存上传文件失败：{e.strerror}"})
+        self._send_json(202, {"job_id": job_id, "status": "queued"})
+
+    def do_GET(self):
+        parts = [p for p in self.path.split("/") if p]
+        if len(parts) not in (2, 3) or parts[0] != "jobs":
+            return self._send_json(404, {"error": "接口不存在"})
+        if len(parts) == 3 and parts[2] != "result":
+            return self._send_json(404, {"error": "接口不存在"})
+
+        service = self.server.service
+        job_id = parts[1]
+        try:
+            if len(parts) == 2:
+                return self._send_json(200, service.status(job_id))
+            file_path = service.result_path(job_id)
+            if file_path is None:
+                return self._send_json(409, service.status(job_id))
+            with open(file_path, "rb") as f:
+                data = f.read()
+        except (KeyError, OSError):
+            # 任务不存在或已被清理
+            return self._send_json(404, {"error": "任务不存在"})
+        self.send_response(200)
+        self.send_header("Content-Type", XLSX_MIME_TYPE)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, code, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_service_server(
+    host=SERVICE_HOST, port=SERVICE_PORT, workers=SERVICE_WORKERS
+):
+    """创建服务模式的HTTP服务器（调用 serve_forever 开始处理请求）"""
+    server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+    server.service = WorkingHoursService(workers=workers)
+    return server
+
+
+def run_service(host, port, workers):
+    """以服务模式运行，直到 Ctrl+C"""
+    server = create_service_server(host, port, workers)
+    signal.signal(signal.SIGTERM, signal.getsignal(signal.SIGINT))
+    print(
+        f"工时计算服务已启动：http://{host}:{server.server_port}（{workers} 个工作进程）"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.shutdown()
+
+
 if __name__ == "__main__":
-    config_window = ConfigWindow()
-    config_window.root.mainloop()
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="工时计算")
+    parser.add_argument("--serve", action="store_true", help="以本地HTTP服务模式运行")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS)
+    args = parser.parse_args()
+
+    if args.serve:
+        run_service(args.host, args.port, args.workers)
+    else:
+        config_window = ConfigWindow()
+        config_window.root.mainloop()